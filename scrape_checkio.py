@@ -1,86 +1,235 @@
 import requests
 import re
+import json
+import hashlib
+import random
 import time
 import os
 import sys
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+import lxml.html
+from lxml.cssselect import CSSSelector
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from selenium import webdriver
+from selenium.webdriver.common.by import By
 from selenium.common.exceptions import StaleElementReferenceException, NoSuchElementException
 
 USERNAME_PATTERN = r'https://py.checkio.org/user/(?P<username>.*?)/'
 MISSION_NAME_PATTERN = r'https://py.checkio.org/mission/(?P<mission_name>.*?)/'
+USERNAME_REGEX = re.compile(USERNAME_PATTERN)
+MISSION_NAME_REGEX = re.compile(MISSION_NAME_PATTERN)
+# anything that isn't a letter or digit gets stripped from folder names
+FOLDER_NAME_STRIP_REGEX = re.compile(r'[\W_]+')
+DEFAULT_FOLDER_NAME = 'Section'
+# the user's saved code is embedded in the solution page as a JSON string
+SOLUTION_CODE_REGEX = re.compile(r'"student_code"\s*:\s*(?P<code>"(?:[^"\\]|\\.)*")')
+
+# selectors for the missions listing, translated to XPath once instead of on every lookup
+SECTION_SELECTOR = CSSSelector('.section')
+SECTION_HEADER_SELECTOR = CSSSelector('.section .section-header')
+TASK_SELECTOR = CSSSelector('.section .block_progress_main')
+TASK_TITLE_SELECTOR = CSSSelector('.block_progress_main img')
+TASK_LINK_SELECTOR = CSSSelector('.block_progress_main a[href]')
 
 USER_PAGE = 'https://py.checkio.org/user/'
 LOGIN_PAGE = 'https://checkio.org/profile/login/'
 MISSIONS_PAGE = 'https://py.checkio.org/user/{name}/list/'
 SOLUTION_PAGE = 'https://py.checkio.org/mission/{name}/solve/'
 
+COOKIE_DOMAIN = '.checkio.org'
+
+CACHE_FILENAME = '.checkio_cache.json'
+MISSIONS_CACHE_FILE = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+                                   'scrape_checkio', 'missions.json')
+
 PAGE_RETRIES = 3
-RETRY_DELAY_SECS = 5
+RETRY_BASE_DELAY_SECS = 0.5
+RETRY_MAX_DELAY_SECS = 30
+HTTP_RETRIES = 5
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+HASH_CHUNK_SIZE = 65536
+DEFAULT_WORKERS = 8
+DEFAULT_MISSION_TTL_SECS = 3600
 VERBOSE = False
 
 
-def get_browser(sessionid=None, user=None, password=None):
-    """ Get a webdriver and log in to the CheckiO site.
-    This will automatically use the sessionid cookie if provided, otherwise
-    it will use the user/pass details to log in. If these are not provided,
-    it will wait for the user to confirm they have logged into their account.
+def get_retry_delay(attempt):
+    """ Get an exponential backoff delay for a retry, with a little random jitter.
 
     Args:
-    sessionid -- Optional contents of the logged-in user's sessionid cookie.
-    user      -- Optional CheckiO username for the login page.
-    password  -- Optional CheckiO password.
+    attempt -- The number of attempts that have already failed, starting at 0.
+
+    Returns:
+    The number of seconds to wait before retrying.
+    """
+    return min(RETRY_MAX_DELAY_SECS, RETRY_BASE_DELAY_SECS * 2**attempt + random.random() * 0.25)
+
+
+def fill_login_form(browser, user, password):
+    """ Enter login details on the login page, and submit them.
+    The site does a bunch of JS after it has loaded, so the form can be missing or replaced
+    when we first look for it. The elements are looked up again on every attempt.
+
+    Args:
+    browser   -- A webdriver browser, showing the login page.
+    user      -- CheckiO username.
+    password  -- CheckiO password.
+
+    Returns:
+    True if the form was submitted, False if it couldn't be found.
+    """
+    attempts = 0
+    while True:
+        try:
+            username_field = browser.find_element(By.ID, "id_username")
+            username_field.clear()
+            username_field.send_keys(user)
+            password_field = browser.find_element(By.ID, "id_password")
+            password_field.clear()
+            password_field.send_keys(password)
+            browser.find_element(By.CLASS_NAME, "abuth__btn").click()
+            return True
+        except (StaleElementReferenceException, NoSuchElementException):
+            if attempts >= PAGE_RETRIES:
+                return False
+            if VERBOSE:
+                print('Attempt {} failed, login page not ready'.format(attempts + 1))
+            time.sleep(get_retry_delay(attempts))
+            attempts += 1
+
+
+def get_browser(headless=False):
+    """ Get a Firefox webdriver.
+    A headless browser also skips loading images and fonts, since nobody needs to see the page.
+
+    Args:
+    headless -- Whether to run the browser without a window.
 
     Returns:
     The open webdriver instance.
     """
-    browser = webdriver.Firefox()
-    browser.get(USER_PAGE)
-    # just use the login cookie if possible
-    if sessionid:
-        browser.add_cookie({'name':'sessionid', 'value':sessionid});
-        return browser
+    options = webdriver.FirefoxOptions()
+    if headless:
+        options.add_argument('--headless')
+        options.set_preference('permissions.default.image', 2)
+        options.set_preference('gfx.downloadable_fonts.enabled', False)
+        options.set_preference('browser.display.use_document_fonts', 0)
+        options.set_preference('dom.ipc.plugins.enabled.libflashplayer.so', False)
+    return webdriver.Firefox(options=options)
 
+
+def wait_for_sessionid(browser):
+    """ Get the session cookie from a browser which has just logged in.
+    The cookie is set once the login request completes, which can lag behind the form submission.
+
+    Args:
+    browser -- A webdriver browser, which should be logged in.
+
+    Returns:
+    The contents of the sessionid cookie, or None if it wasn't set.
+    """
+    for attempt in range(PAGE_RETRIES + 1):
+        cookie = browser.get_cookie('sessionid')
+        if cookie:
+            return cookie['value']
+        if attempt < PAGE_RETRIES:
+            time.sleep(get_retry_delay(attempt))
+    return None
+
+
+def get_sessionid(user=None, password=None):
+    """ Log in to the CheckiO site with a webdriver, and get the session cookie.
+    This will use the user/pass details to log in with a headless browser if they are provided,
+    otherwise it will open a browser and wait for the user to confirm they have logged into their account.
+    The browser is closed once the cookie has been captured.
+
+    Args:
+    user      -- Optional CheckiO username for the login page.
+    password  -- Optional CheckiO password.
+
+    Returns:
+    The contents of the logged-in user's sessionid cookie, or None if it wasn't set.
+    """
     # need to log in somehow, try to use supplied credentials
     if user and password:
+        browser = get_browser(headless=True)
         try:
-            browser.find_element_by_id("id_username").send_keys(user)
-            browser.find_element_by_id("id_password").send_keys(password)
-            browser.find_element_by_class_name("abuth__btn").click()
-            return browser
-        except NoSuchElementException:
-            print("ERROR: couldn't find expected elements on the login page, you need to log in manually")
-        
+            browser.get(USER_PAGE)
+            if not fill_login_form(browser, user, password):
+                print("ERROR: couldn't find expected elements on the login page, you need to log in manually")
+            else:
+                sessionid = wait_for_sessionid(browser)
+                if sessionid:
+                    return sessionid
+                print("ERROR: couldn't log in with those details, you need to log in manually")
+        finally:
+            browser.quit()
+
     # default to asking the user to log in manually
-    input("\nPlease log in to the CheckiO site, then hit Enter to continue.")        
-    return browser
+    browser = get_browser()
+    try:
+        browser.get(USER_PAGE)
+        input("\nPlease log in to the CheckiO site, then hit Enter to continue.")
+        return wait_for_sessionid(browser)
+    finally:
+        browser.quit()
+
 
+def get_session(sessionid, pool_size=DEFAULT_WORKERS):
+    """ Get an HTTP session which is logged in to the CheckiO site.
+    The session keeps a pool of connections open, and retries failed requests with exponential backoff,
+    including when the site is rate-limiting or having temporary server errors.
+
+    Args:
+    sessionid -- Contents of the logged-in user's sessionid cookie.
+    pool_size -- The number of connections to keep open, which should match the number of download threads.
 
-def get_username(browser):
+    Returns:
+    The requests session.
+    """
+    session = requests.Session()
+    retry = Retry(total=HTTP_RETRIES, backoff_factor=HTTP_BACKOFF_FACTOR,
+                  status_forcelist=HTTP_RETRY_STATUSES, allowed_methods=frozenset(['GET']),
+                  respect_retry_after_header=True)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('https://', adapter)
+    # only send the login cookie to CheckiO, not to anywhere we might get redirected
+    session.cookies.set('sessionid', sessionid, domain=COOKIE_DOMAIN)
+    return session
+
+
+def get_username(session):
     """ Get the username of the currently logged-in user.
 
     Args:
-    browser -- A webdriver browser, which should be logged in.
+    session -- A requests session, which should be logged in.
 
     Returns:
     The user's username, or None if it can't be parsed (probably not logged in).
     """
-    # load the user profile page, and parse the username from its URL
-    browser.get(USER_PAGE)
+    # load the user profile page, and parse the username from the URL we end up at
     try:
-        return re.match(USERNAME_PATTERN, browser.current_url).group('username')
+        response = session.get(USER_PAGE)
+    except requests.RequestException:
+        print("ERROR: Unable to load the user page.")
+        return None
+    try:
+        return USERNAME_REGEX.match(response.url).group('username')
     except AttributeError:
-        if browser.current_url.startswith(LOGIN_PAGE):
+        if response.url.startswith(LOGIN_PAGE):
             print("ERROR: It looks like you're not logged in.")
         return None
 
 
-def get_missions(browser, username):
+def get_missions(session, username):
     """ Get a dict of mission categories, and the list of missions in each.
 
     Args:
-    browser -- A webdriver browser, which should be logged in.
+    session -- A requests session, which should be logged in.
 
     Returns:
     A dict of mission category names, mapping to lists of missions.
@@ -89,154 +238,423 @@ def get_missions(browser, username):
     """
     # jump straight to the completed missions listing, instead of navigating slowly
     url = MISSIONS_PAGE.format(name=username)
-    browser.get(url)
+    try:
+        response = session.get(url)
+        response.raise_for_status()
+    except requests.RequestException:
+        print("ERROR: unable to load mission list")
+        return {}
+    page = lxml.html.fromstring(response.content)
+    page.make_links_absolute(response.url)
 
     # get all the mission sections
-    regex = re.compile(MISSION_NAME_PATTERN)
     section_list = {}
     try:
-        for section in browser.find_elements_by_class_name('section'):
-            title = section.find_element_by_class_name('section-header').text
-        
+        for section in SECTION_SELECTOR(page):
+            title = SECTION_HEADER_SELECTOR(section)[0].text_content().strip()
+
             # get all the missions in this section
             task_list = []
-            for task in section.find_elements_by_class_name('block_progress_main'):
-                task_title = task.find_element_by_tag_name('img').get_attribute('title')
-                
+            for task in TASK_SELECTOR(section):
+                task_title = TASK_TITLE_SELECTOR(task)[0].get('title')
+
                 # get the mission URL, but extract the code so we can jump straight to the solution page
-                href = task.find_element_by_tag_name('a').get_attribute('href')
-                task_code = regex.match(href).group('mission_name')
-            
+                href = TASK_LINK_SELECTOR(task)[0].get('href')
+                task_code = MISSION_NAME_REGEX.match(href).group('mission_name')
+
                 mission = {'title':task_title, 'url_name':task_code}
-                task_list.append(mission)            
+                task_list.append(mission)
             section_list[title] = task_list
         return section_list
-    except NoSuchElementException:
+    except (IndexError, AttributeError):
         print("ERROR: unable to parse mission list, unexpected page structure")
         return {}
-            
 
-def get_solution(browser, mission):
+
+def get_solution(session, mission, cached=None):
     """ Get the user's code currently saved in a mission's solution.
+    If a cache entry from a previous download is provided, this makes a conditional request,
+    and checks the code's hash in case the site doesn't support that.
 
     Args:
-    browser -- A webdriver browser, which should be logged-in.
+    session -- A requests session, which should be logged in.
     mission -- A mission dict, containing its title and URL path name.
+    cached  -- Optional cache entry for this mission, from a previous download.
 
     Returns:
-    The currently saved code, as a list of lines.
+    A (code, cache_entry) tuple. The code is the currently saved code as a list of lines,
+    or None if it hasn't changed since the cached download.
+
+    Raises:
+    IOError -- If the code couldn't be downloaded.
     """
     # this lets us jump straight to the solution, instead of slowly navigating via the mission page
     mission_url = SOLUTION_PAGE.format(name=mission)
+    headers = {}
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
     if VERBOSE:
         print("Downloading: {}".format(mission_url))
-    browser.get(mission_url)
-    
-    # the site does a bunch of JS after it has loaded, so elements can go missing halfway through
-    # if we run into an error, give up and delay before retrying - either return all lines, or nothing
-    attempts = 0
-    while attempts <= PAGE_RETRIES:
-        try:
-            attempts += 1
-            lines = browser.find_elements_by_class_name('ace_line')
-            return [line.text for line in lines]
-        except StaleElementReferenceException:
-            if VERBOSE:
-                print('Attempt {} failed, page not ready'.format(attempts))
-            time.sleep(RETRY_DELAY_SECS)
-    if VERBOSE:
-        print('Failed after {} attempts'.format(attempts))
-    return None
+    try:
+        response = session.get(mission_url, headers=headers)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        if VERBOSE:
+            print('Failed to download {}: {}'.format(mission_url, e))
+        raise IOError()
+    if response.status_code == 304:
+        return None, cached
+
+    # the editor's contents are embedded in the page, so we can pull them out without running any JS
+    match = SOLUTION_CODE_REGEX.search(response.text)
+    if not match:
+        if VERBOSE:
+            print('No saved code found in {}'.format(mission_url))
+        raise IOError()
+    try:
+        code = json.loads(match.group('code'))
+    except ValueError:
+        if VERBOSE:
+            print('Unable to parse saved code in {}'.format(mission_url))
+        raise IOError()
+
+    # only split on real line breaks - str.splitlines would also split on form feeds etc. inside the code
+    code = code.replace('\r\n', '\n')
+    if code.endswith('\n'):
+        code = code[:-1]
+    lines = code.split('\n') if code else []
+    cache_entry = {'etag': response.headers.get('ETag'),
+                   'last_modified': response.headers.get('Last-Modified'),
+                   'digest': hash_lines(lines)}
+    if cached and cached.get('digest') == cache_entry['digest']:
+        return None, cache_entry
+    return lines, cache_entry
+
+
+def load_cache(root_dir):
+    """ Load the cache of previously downloaded solutions from the root folder.
+
+    Args:
+    root_dir -- The folder the solutions are downloaded to.
+
+    Returns:
+    A dict of mission URL path names, mapping to their cache entries. Empty if there's no cache.
+    """
+    try:
+        with open(os.path.join(root_dir, CACHE_FILENAME), mode='r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # ignore anything that doesn't look like a cache we wrote
+    if not isinstance(cache, dict):
+        return {}
+    return {url_name: entry for url_name, entry in cache.items() if isinstance(entry, dict)}
+
+
+def save_cache(root_dir, cache):
+    """ Save the cache of downloaded solutions to the root folder.
+
+    Args:
+    root_dir -- The folder the solutions are downloaded to.
+    cache    -- A dict of mission URL path names, mapping to their cache entries.
+    """
+    try:
+        write_json_file(os.path.join(root_dir, CACHE_FILENAME), cache)
+    except OSError:
+        print("ERROR: Unable to save the download cache")
+
+
+def load_cached_missions(username, max_age):
+    """ Get a user's mission list from the local cache, if it was saved recently enough.
+
+    Args:
+    username -- The CheckiO username the missions belong to.
+    max_age  -- The maximum age of the cached list, in seconds.
+
+    Returns:
+    The cached dict of mission categories (see get_missions), or None if there isn't a fresh one.
+    """
+    try:
+        with open(MISSIONS_CACHE_FILE, mode='r', encoding='utf-8') as f:
+            entry = json.load(f)[username]
+        if time.time() - entry['timestamp'] > max_age:
+            return None
+        sections = entry['sections']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    # ignore anything that doesn't look like a mission list we wrote
+    if not isinstance(sections, dict):
+        return None
+    for missions in sections.values():
+        if not isinstance(missions, list):
+            return None
+        if not all(isinstance(mission, dict) and 'title' in mission and 'url_name' in mission
+                   for mission in missions):
+            return None
+    return sections
+
+
+def save_cached_missions(username, missions):
+    """ Save a user's mission list to the local cache.
+
+    Args:
+    username -- The CheckiO username the missions belong to.
+    missions -- The dict of mission categories (see get_missions).
+    """
+    try:
+        with open(MISSIONS_CACHE_FILE, mode='r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        cached = {}
+    if not isinstance(cached, dict):
+        cached = {}
+    cached[username] = {'timestamp': time.time(), 'sections': missions}
+    try:
+        os.makedirs(os.path.dirname(MISSIONS_CACHE_FILE), exist_ok=True)
+        write_json_file(MISSIONS_CACHE_FILE, cached)
+    except OSError:
+        print("ERROR: Unable to save the mission list cache")
+
+
+def write_json_file(filename, data):
+    """ Write some data to a JSON file.
+    The file is replaced atomically, so an interrupted run can't leave it half-written.
+
+    Args:
+    filename -- The path to the file.
+    data     -- The data to write, which must be JSON-serialisable.
+
+    Raises:
+    OSError  -- If the file couldn't be written.
+    """
+    temp_filename = filename + '.tmp'
+    with open(temp_filename, mode='w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+    os.replace(temp_filename, filename)
 
 
-def create_and_switch_to_dir(dir_path):
-    """ Create a directory in the current directory, and set that as the current dir.
+def ensure_dir(dir_path):
+    """ Create a directory, if it doesn't already exist.
 
     Args:
     dir_path -- The path to the directory that will be created.
 
+    Returns:
+    The absolute path to the directory.
+
     Raises:
     IOError  -- If the directory doesn't exist and couldn't be created.
     """
     try:
         os.makedirs(dir_path, exist_ok=True)
-        os.chdir(dir_path)
-    except (NotADirectoryError, FileNotFoundError):
+    except OSError:
         raise IOError()
+    return os.path.abspath(dir_path)
+
+
+def encode_lines(lines):
+    """ Get the contents of a file containing some lines of text.
+
+    Args:
+    lines -- A list of lines, without line endings.
+
+    Returns:
+    The UTF-8 encoded lines, each ending with a newline.
+    """
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def hash_lines(lines):
+    """ Get a digest of some lines of text, exactly as they would be written to a file.
+
+    Args:
+    lines -- A list of lines, without line endings.
+
+    Returns:
+    The hex digest of the lines.
+    """
+    return hashlib.blake2b(encode_lines(lines)).hexdigest()
 
 
-def write_solution_to_file(browser, mission):
+def hash_solution_file(filename, code_size):
+    """ Get a digest of the code in a solution file, skipping the header line and reading it in chunks.
+    The rest of the file is only read if it's the expected size.
+
+    Args:
+    filename  -- The path to the file.
+    code_size -- The size in bytes the code is expected to be.
+
+    Returns:
+    The hex digest of the code, or None if it's a different size.
+
+    Raises:
+    OSError   -- If the file couldn't be read.
+    """
+    with open(filename, mode='rb') as f:
+        f.readline()
+        if os.fstat(f.fileno()).st_size - f.tell() != code_size:
+            return None
+        digest = hashlib.blake2b()
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_solution_to_file(session, mission, dest_dir, cache):
     """ Get the user's solution code for a mission, and write it to a file.
     This will use the mission's URL path name as the filename,
     and adds an initial comment line with the mission's title.
+    The file is skipped entirely if the solution hasn't changed since it was last downloaded.
 
     Args:
-    browser -- A webdriver browser, which should be logged-in.
-    mission -- A mission dict, containing its title and URL path name.
+    session  -- A requests session, which should be logged in.
+    mission  -- A mission dict, containing its title and URL path name.
+    dest_dir -- The folder the file will be written to.
+    cache    -- A dict of cache entries, which is updated after the file is written.
     """
-    # Get the code listing as a list of lines, adding the mission title at the top    
-    downloaded = get_solution(browser, mission['url_name'])
+    url_name = mission['url_name']
+    filename = os.path.join(dest_dir, url_name + '.py')
+    # only trust the cache if the file it describes is still there
+    cached = cache.get(url_name) if os.path.exists(filename) else None
+
+    # Get the code listing as a list of lines
+    downloaded, cache_entry = get_solution(session, url_name, cached)
+    if downloaded is None:
+        cache[url_name] = cache_entry
+        return
     if not downloaded:
         raise IOError()
-    download_time = datetime.now().strftime('%c')
-    code = ['# "{}" downloaded: {}'.format(mission['title'], download_time)]
-    code.extend(downloaded);
-    filename = mission['url_name'] + '.py'
+    code = encode_lines(downloaded)
 
-    # if the file exists and is identical, don't touch it
+    # if the file exists and has identical code, don't touch it - the header line changes every time,
+    # so it's ignored, and the cache entry already has the new code's digest
     try:
-        with open(filename, mode='r') as f:
-            if f.read().splitlines() == code:
-                return
+        if hash_solution_file(filename, len(code)) == cache_entry['digest']:
+            cache[url_name] = cache_entry
+            return
     except OSError:
         pass
+
+    # add the mission title at the top
+    download_time = datetime.now().strftime('%c')
+    header = '# "{}" downloaded: {}'.format(mission['title'], download_time)
+    content = encode_lines([header]) + code
                 
     # overwrite the file with the scraped code
     try: 
-        with open(filename, mode='w') as f:
-            for line in code:
-                print(line, file=f)
+        with open(filename, mode='wb') as f:
+            f.write(content)
     except IOError:
         # couldn't save the file - clean up and let the caller know
         os.remove(filename)
         raise
+    cache[url_name] = cache_entry
 
 
-def download_section(section_name, missions):
-    """ Download a section's missions, creating a new folder in the current directory.
+def get_section_dirs(section_names):
+    """ Generate a unique folder name for each section.
+    Names are stripped down to letters and digits, and numbered if that makes them clash.
+    Names with no letters or digits at all get a default folder name instead.
+    Sections claim their plain folder names before any numbering happens, so a clash
+    can't move another section's folder when sections are added or reordered.
 
     Args:
-    section_name -- used to generate a name for the folder
+    section_names -- the names of the sections
+
+    Returns:
+    a dict of section names, mapping to their folder names
+    """
+    base_names = {name: FOLDER_NAME_STRIP_REGEX.sub('', name) for name in section_names}
+    # names that didn't need stripping get first pick, then stripped names, then defaults (in page order)
+    ordered = sorted(base_names, key=lambda name: 0 if base_names[name] == name else 1 if base_names[name] else 2)
+    section_dirs = {}
+    used = set()
+    for section_name in ordered:
+        base_name = base_names[section_name]
+        if base_name and base_name.lower() not in used:
+            used.add(base_name.lower())
+            section_dirs[section_name] = base_name
+
+    # anything left over clashed with another section, or needs a default name
+    for section_name in ordered:
+        if section_name in section_dirs:
+            continue
+        base_name = base_names[section_name] or DEFAULT_FOLDER_NAME
+        dir_name = base_name
+        suffix = 2
+        while dir_name.lower() in used:
+            dir_name = "{}{}".format(base_name, suffix)
+            suffix += 1
+        if dir_name != base_name:
+            print("Section ({}) clashes with another folder name, using {}".format(section_name, dir_name))
+        used.add(dir_name.lower())
+        section_dirs[section_name] = dir_name
+    return {name: section_dirs[name] for name in base_names}
+
+
+def get_section_tasks(section_name, dir_name, missions, root_dir):
+    """ Create a section's folder in the root folder, and list the downloads for its missions.
+
+    Args:
+    section_name -- the name of the section, for reporting
+    dir_name     -- the name of the section's folder
     missions     -- the list of missions in this section
+    root_dir     -- the folder to create the section's folder in
 
     Returns:
-    a list of errors, which may be empty
+    a list of (section_name, folder, mission) download tasks
+
+    Raises:
+    IOError      -- If the section's folder couldn't be created.
+    """
+    print("Getting section ({}) with {} missions".format(section_name, len(missions)))
+    # create the section's folder up front, so the downloads can write straight to it
+    section_dir = ensure_dir(os.path.join(root_dir, dir_name))
+    return [(section_name, section_dir, mission) for mission in missions]
+
+
+def download_mission(session, cache, section_name, dest_dir, mission):
+    """ Download a mission's solution into a section's folder.
+    This is safe to run in parallel with other downloads.
+
+    Args:
+    session      -- A requests session, which should be logged in.
+    cache        -- A dict of cache entries for previously downloaded solutions.
+    section_name -- the name of the mission's section, for error reporting
+    dest_dir     -- the section's folder
+    mission      -- A mission dict, containing its title and URL path name.
+
+    Returns:
+    an error message, or None if the download succeeded
     """
-    print("Getting section ({}) with {} missions".format(section_name, len(mission_list)))
-    # create the section's folder, fail if unable
-    original_dir = os.getcwd()
-    dir_name = "".join(char for char in section_name if char.isalnum())
     try:
-        create_and_switch_to_dir(dir_name)
+        write_solution_to_file(session, mission, dest_dir, cache)
     except IOError:
-        return ["Unable to create folder for section: {}".format(section_name)]
-    
-    errors = []
-    for mission in mission_list:
-        try:
-            write_solution_to_file(browser, mission)
-        except IOError:
-            errors.append("{}: {}".format(section_name, mission['title']))
-    # move back up to the original folder, so we can create the next subfolder
-    os.chdir(original_dir)
-    return errors
-    
+        return "{}: {}".format(section_name, mission['title'])
+    except Exception as e:
+        # don't let one bad mission take down the rest of the run
+        return "{}: {} ({})".format(section_name, mission['title'], e)
+    return None
+
+
+def positive_int(value):
+    """ Argument type for a whole number greater than zero """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be a whole number greater than 0: {}".format(value))
+    return number
 
 
 def get_args():
     """ Defines and processes command-line options and arguments """
     parser = argparse.ArgumentParser(
-        description="Automatically download a user's CheckiO Python solutions, using Firefox",
+        description="Automatically download a user's CheckiO Python solutions, using Firefox to log in if needed",
         epilog="You can provide either the sessionid cookie data from an already logged-in "
                "browser session, or login details for the CheckiO site. If you would prefer "
                "to log in manually (for example, using 3rd-party authorisation like Facebook), "
@@ -246,6 +664,15 @@ def get_args():
                         help=("optional folder path to download to. "
                               "Omitting this downloads to the current directory.")
                         )
+    parser.add_argument('-w', '--workers', metavar='count', type=positive_int, default=DEFAULT_WORKERS,
+                        help=("number of solutions to download in parallel (default: %(default)s)")
+                        )
+    parser.add_argument('--mission-ttl', metavar='seconds', type=int, default=DEFAULT_MISSION_TTL_SECS,
+                        help=("how long to reuse the cached mission list for (default: %(default)s)")
+                        )
+    parser.add_argument('--refresh-missions', action="store_true",
+                        help=("ignore the cached mission list and fetch it again")
+                        )
     parser.add_argument('-v', '--verbose', action="store_true")
     credentials = parser.add_mutually_exclusive_group()
     credentials.add_argument('-s', '--sessionid', metavar='cookie_data', 
@@ -260,28 +687,65 @@ def get_args():
 if __name__ == '__main__':
     args = get_args()
     VERBOSE = args.verbose
-    # move to the specified dir, if any
-    if args.dest_dir:
-        try:
-            create_and_switch_to_dir(args.dest_dir)
-        except IOError:
-            sys.exit("ERROR: Unable to create destination folder")
+    # create the specified dir, if any - all the files are written using paths inside it
+    try:
+        root_dir = ensure_dir(args.dest_dir or os.curdir)
+    except IOError:
+        sys.exit("ERROR: Unable to create destination folder")
     
-    browser = get_browser(args.sessionid, *args.login)
-    username = get_username(browser)
+    # the browser is only needed to log in, everything else can use the session cookie directly
+    sessionid = args.sessionid or get_sessionid(*args.login)
+    if not sessionid:
+        sys.exit("ERROR: Unable to get sessionid cookie - was login successful?")
+    session = get_session(sessionid, args.workers)
+    username = get_username(session)
     if not username:
         sys.exit("ERROR: Unable to get username - was login successful?")
 
-    # get the groups of missions, and download each group to its own folder
-    missions = get_missions(browser, username)
-    errors = []    
+    # get the groups of missions, reusing the last list we fetched if it's recent enough
+    missions = None
+    if not args.refresh_missions:
+        missions = load_cached_missions(username, args.mission_ttl)
+        if missions is not None:
+            print("Using the cached mission list - run with --refresh-missions to include newly solved missions")
+    if missions is None:
+        missions = get_missions(session, username)
+        if missions:
+            save_cached_missions(username, missions)
+
+    # create a folder for each group of missions
+    errors = []
+    tasks = []
+    section_dirs = get_section_dirs([name for name in missions if name])
     for section_name, mission_list in missions.items():
         if not section_name:
             errors.append("Unknown section containing:")
             for mission in mission_list:
                 errors.append("-- {}".format(mission['title']))
         else:
-            errors.extend(download_section(section_name, mission_list))
+            try:
+                tasks.extend(get_section_tasks(section_name, section_dirs[section_name], mission_list, root_dir))
+            except IOError:
+                errors.append("Unable to create folder for section: {}".format(section_name))
+
+    # download all the missions in parallel, since most of the time is spent waiting on the site
+    cache = load_cache(root_dir)
+    # queue everything at once so the pool is saturated straight away, and report errors in mission order
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = [executor.submit(download_mission, session, cache, *task) for task in tasks]
+            try:
+                for future in futures:
+                    error = future.result()
+                    if error:
+                        errors.append(error)
+            except KeyboardInterrupt:
+                # drop the queued downloads, so we only wait for the ones already in progress
+                for future in futures:
+                    future.cancel()
+                sys.exit("\nDownload interrupted.")
+    finally:
+        save_cache(root_dir, cache)
 
     # TODO: results dict, with added/updated/error
 